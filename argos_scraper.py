@@ -9,23 +9,37 @@
 # - Uses search engines for EAN searches
 # - Uses Argos direct search for model numbers (less rate limited)
 # - Tracks accessed URLs to prevent duplicate requests
+# - Processes several products concurrently using aiohttp
 #
 # ==============================================================================
 
 import os
 import sys
+import csv
 import json
 import time
 import random
 import re
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from urllib.parse import urlparse, quote
+import sqlite3
 import pickle
+import asyncio
+import atexit
+import heapq
+import logging
+import threading
+import aiohttp
+import orjson
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from selectolax.lexbor import LexborHTMLParser
+from urllib.parse import urlparse, quote
 from typing import Optional, Tuple, Dict, List
 
+try:
+    import uvloop  # Optional faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
 # ==============================================================================
 # CONFIGURATION
 # ==============================================================================
@@ -34,10 +48,10 @@ CONFIG = {
     # File paths
     'input_csv': 'input.csv',
     'output_directory': 'scraped_products',
-    'success_file': 'successful_products.pkl',
-    'not_found_file': 'not_found_products.pkl',
+    'success_file': 'successful_products.jsonl',
+    'not_found_file': 'not_found_products.jsonl',
     'blocked_status_file': 'search_blocked_status.json',
-    'accessed_urls_file': 'accessed_urls.pkl',
+    'accessed_urls_file': 'accessed_urls.db',
 
     # Enhanced delay settings with exponential backoff
     'min_delay': 5,
@@ -55,9 +69,21 @@ CONFIG = {
     'search_timeout': 20,
     'num_results': 3,  # Increased to get more results
     'rotate_backends': True,
+    'ean_batch_size': 5,  # EANs combined into one search query (1 disables batching)
 
     # HTTP request settings
     'request_timeout': 15,
+    'max_concurrency': 10,  # Products processed at the same time
+    'max_connections': 32,  # Size of the shared keep-alive connection pool
+    'parse_workers': None,  # Processes for HTML parsing (None = one per CPU)
+    'dns_cache_ttl': 600,  # Seconds to cache DNS lookups
+    'keepalive_timeout': 60,  # Seconds to keep idle connections open
+
+    # Accessed URL tracking
+    'url_flush_batch': 100,  # Accessed URLs buffered before each database write
+
+    # Checkpointing
+    'checkpoint_interval': 30,  # Seconds between state saves while scraping
 
     # User agents for variety
     'user_agents': [
@@ -87,6 +113,44 @@ CONFIG = {
     'log_file': 'scraper_log.txt'
 }
 
+# ==============================================================================
+# CONFIG BINDINGS
+# ==============================================================================
+
+def bind_config():
+    """
+    Copy CONFIG values used on every request into module constants.
+    Called at import and again by main(), so edits to CONFIG made before
+    the scraper starts still apply.
+    """
+    global MIN_DELAY, MAX_DELAY, ARGOS_SEARCH_DELAY, BLOCK_COOLDOWN, BACKOFF_BASE, MAX_BACKOFF_DELAY
+    global MAX_RETRIES, RETRY_DELAY, SEARCH_TIMEOUT, NUM_RESULTS, SEARCH_BACKENDS, USER_AGENTS
+    global DEBUG_SEARCH, VERBOSE, LOG_FILE, URL_FLUSH_BATCH, _VALID_URL_RE
+
+    MIN_DELAY = CONFIG['min_delay']
+    MAX_DELAY = CONFIG['max_delay']
+    ARGOS_SEARCH_DELAY = CONFIG['argos_search_delay']
+    BLOCK_COOLDOWN = CONFIG['block_cooldown']
+    BACKOFF_BASE = CONFIG['exponential_backoff_base']
+    MAX_BACKOFF_DELAY = CONFIG['max_backoff_delay']
+    MAX_RETRIES = CONFIG['max_retries']
+    RETRY_DELAY = CONFIG['retry_delay']
+    SEARCH_TIMEOUT = CONFIG['search_timeout']
+    NUM_RESULTS = CONFIG['num_results']
+    SEARCH_BACKENDS = tuple(CONFIG['search_backends'])
+    USER_AGENTS = tuple(CONFIG['user_agents'])
+    DEBUG_SEARCH = CONFIG.get('debug_search', False)
+    VERBOSE = CONFIG['verbose']
+    LOG_FILE = CONFIG['log_file']
+    URL_FLUSH_BATCH = CONFIG['url_flush_batch']
+
+    _VALID_URL_RE = re.compile('|'.join(CONFIG['valid_url_patterns']))
+    # Cached URL classifications depend on the patterns (not yet defined at import)
+    if 'is_valid_product_url' in globals():
+        is_valid_product_url.cache_clear()
+
+bind_config()
+
 # ==============================================================================
 # GLOBAL VARIABLES
 # ==============================================================================
@@ -94,7 +158,34 @@ CONFIG = {
 BACKEND_FAILURES = {}  # Track failures per backend
 LAST_REQUEST_TIME = {}  # Track last request time per backend
 CONSECUTIVE_FAILURES = 0  # Track consecutive failures across all backends
-ACCESSED_URLS = set()  # Track all accessed URLs to prevent duplicates
+URL_DB = None  # sqlite connection tracking all accessed URLs to prevent duplicates
+PENDING_URLS = set()  # Accessed URLs not yet written to URL_DB
+BACKEND_LOCKS = {}  # Serialise delays per backend across concurrent tasks
+STATE_LOCK = None  # Guards the shared consecutive-failure cooldown during a run
+STATE_LOGS = {}  # Append-mode state log handles keyed by CONFIG file key
+PREFETCHED_PAGES = {}  # Product page bodies downloaded while checking existence
+PARSE_EXECUTOR = None  # Process pool for HTML parsing while scraping runs
+BLOCK_HEAP = []  # (cooldown expiry, backend) min-heap; stale entries are dropped lazily
+DDGS_LOCAL = threading.local()  # One DDGS client per search thread, keeping its connections open
+
+# ==============================================================================
+# PRECOMPILED PATTERNS
+# ==============================================================================
+
+# _VALID_URL_RE is built from CONFIG['valid_url_patterns'] by bind_config()
+_EXCLUDE_URL_RE = re.compile(r'/search/|/browse/|/category/|/c:|/static/')
+_PRODUCT_PATH_RE = re.compile(r'/product/\d+')
+
+# Product data embedded in script tags, tried in order
+_SCRIPT_DATA_RES = (
+    re.compile(r'window\.__data\s*=\s*({.*?});', re.DOTALL),
+    re.compile(r'window\.__PRELOADED_STATE__\s*=\s*({.*?});', re.DOTALL),
+    re.compile(r'=\s*({.*})\s*;?\s*$', re.DOTALL),
+)
+# Assignment markers for the str.find fast path, tried before the regexes above
+_SCRIPT_DATA_MARKERS = ('window.__data', 'window.__PRELOADED_STATE__')
+_TRAILING_COMMA_OBJ_RE = re.compile(r',\s*}')
+_TRAILING_COMMA_ARR_RE = re.compile(r',\s*]')
 
 # ==============================================================================
 # DEPENDENCY INSTALLATION
@@ -104,9 +195,9 @@ def install_dependencies():
     """Install required libraries if not present."""
     required_packages = {
         'ddgs': 'ddgs',
-        'pandas': 'pandas',
-        'requests': 'requests',
-        'bs4': 'beautifulsoup4'
+        'aiohttp': 'aiohttp',
+        'selectolax': 'selectolax',
+        'orjson': 'orjson'
     }
 
     for module, package in required_packages.items():
@@ -124,57 +215,110 @@ def install_dependencies():
 # UTILITY FUNCTIONS
 # ==============================================================================
 
+SUCCESS = 25  # Custom log level between INFO and WARNING
+logging.addLevelName(SUCCESS, 'SUCCESS')
+LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'SUCCESS': SUCCESS,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+}
+LOGGER = logging.getLogger('argos')
+
+def setup_logging():
+    """Configure the scraper logger with a persistent log file and console output."""
+    for handler in list(LOGGER.handlers):
+        LOGGER.removeHandler(handler)
+        handler.close()
+
+    LOGGER.setLevel(logging.DEBUG if DEBUG_SEARCH else logging.INFO)
+    LOGGER.propagate = False
+    formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+    if VERBOSE:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        LOGGER.addHandler(console_handler)
+
+    # The file is opened on the first message and kept open
+    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8', delay=True)
+    file_handler.setFormatter(formatter)
+    LOGGER.addHandler(file_handler)
+
 def log_message(message, level="INFO"):
     """Log messages with timestamp."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    formatted_message = f"[{timestamp}] [{level}] {message}"
+    LOGGER.log(LOG_LEVELS.get(level, logging.INFO), message)
+
+setup_logging()
+
+# Headers that never change are set once on the HTTP session
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.9,en-US;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
 
-    if CONFIG['verbose']:
-        print(formatted_message)
+def get_random_headers():
+    """Generate per-request headers with random User-Agent."""
+    return {'User-Agent': random.choice(USER_AGENTS)}
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the shared HTTP session with a keep-alive connection pool."""
+    # Keep DNS answers and idle connections around longer than the delays
+    # between requests, so paced requests skip the lookup and TLS handshake
+    connector = aiohttp.TCPConnector(
+        limit=CONFIG['max_connections'],
+        ttl_dns_cache=CONFIG['dns_cache_ttl'],
+        keepalive_timeout=CONFIG['keepalive_timeout']
+    )
+    timeout = aiohttp.ClientTimeout(total=CONFIG['request_timeout'])
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS)
+
+async def adaptive_delay(backend: str = None, is_blocked: bool = False, is_argos_search: bool = False):
+    """
+    Implement adaptive delay with exponential backoff.
+    Delays for the same backend are serialised so concurrent tasks keep
+    the configured spacing between requests to that backend.
+    """
+    if backend not in BACKEND_LOCKS:
+        BACKEND_LOCKS[backend] = asyncio.Lock()
 
-    try:
-        with open(CONFIG['log_file'], 'a', encoding='utf-8') as f:
-            f.write(formatted_message + '\n')
-    except:
-        pass
+    async with BACKEND_LOCKS[backend]:
+        delay = _compute_delay(backend, is_blocked, is_argos_search)
+        log_message(f"Waiting {delay:.2f} seconds before next request...")
+        await asyncio.sleep(delay)
 
-def get_random_headers():
-    """Generate headers with random User-Agent."""
-    return {
-        'User-Agent': random.choice(CONFIG['user_agents']),
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-GB,en;q=0.9,en-US;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0',
-    }
+        # Update last request time
+        if backend:
+            LAST_REQUEST_TIME[backend] = time.time()
 
-def adaptive_delay(backend: str = None, is_blocked: bool = False, is_argos_search: bool = False):
-    """Implement adaptive delay with exponential backoff."""
-    global LAST_REQUEST_TIME, BACKEND_FAILURES
-    
+def _compute_delay(backend: str, is_blocked: bool, is_argos_search: bool) -> float:
+    """Calculate how long to wait before the next request to a backend."""
     # Calculate base delay
     if is_blocked:
-        delay = CONFIG['block_cooldown']
+        delay = BLOCK_COOLDOWN
     elif is_argos_search:
-        delay = CONFIG['argos_search_delay']
+        delay = ARGOS_SEARCH_DELAY
     else:
         # Check if we need exponential backoff for this backend
         if backend and backend in BACKEND_FAILURES:
             failures = BACKEND_FAILURES[backend]
             backoff_delay = min(
-                CONFIG['min_delay'] * (CONFIG['exponential_backoff_base'] ** failures),
-                CONFIG['max_backoff_delay']
+                MIN_DELAY * (BACKOFF_BASE ** failures),
+                MAX_BACKOFF_DELAY
             )
             delay = backoff_delay
         else:
-            delay = random.uniform(CONFIG['min_delay'], CONFIG['max_delay'])
+            delay = random.uniform(MIN_DELAY, MAX_DELAY)
     
     # Add jitter to avoid patterns
     delay += random.uniform(0, 2 if is_argos_search else 5)
@@ -184,43 +328,78 @@ def adaptive_delay(backend: str = None, is_blocked: bool = False, is_argos_searc
         time_since_last = time.time() - LAST_REQUEST_TIME[backend]
         if time_since_last < delay:
             delay = delay - time_since_last
-    
-    log_message(f"Waiting {delay:.2f} seconds before next request...")
-    time.sleep(delay)
-    
-    # Update last request time
-    if backend:
-        LAST_REQUEST_TIME[backend] = time.time()
 
+    return delay
+
+@lru_cache(maxsize=4096)
 def is_valid_product_url(url):
-    """Check if the URL is a valid Argos product page."""
+    """
+    Check if the URL is a valid Argos product page.
+    Results are cached because the same URLs recur across searches.
+    """
     if not url or 'argos.co.uk' not in url:
         return False
 
-    for pattern in CONFIG['valid_url_patterns']:
-        if re.search(pattern, url):
-            return True
+    return not _EXCLUDE_URL_RE.search(url) and bool(_VALID_URL_RE.search(url))
 
-    exclude_patterns = ['/search/', '/browse/', '/category/', '/c:', '/static/']
-    for pattern in exclude_patterns:
-        if pattern in url:
-            return False
-
-    return False
+@lru_cache(maxsize=4096)
+def canonicalize_url(url):
+    """
+    Normalise a URL so trivially different forms of the same page compare equal:
+    lowercase scheme and host, drop query, fragment and trailing slash.
+    """
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
 
 def has_url_been_accessed(url):
     """Check if URL has been accessed before."""
-    return url in ACCESSED_URLS
+    url = canonicalize_url(url)
+    if url in PENDING_URLS:
+        return True
+    if URL_DB is None:
+        return False
+    return URL_DB.execute('SELECT 1 FROM accessed_urls WHERE url = ?', (url,)).fetchone() is not None
 
 def mark_url_accessed(url):
-    """Mark URL as accessed."""
-    ACCESSED_URLS.add(url)
+    """Mark URL as accessed. Writes are batched to amortise commits."""
+    PENDING_URLS.add(canonicalize_url(url))
+    if len(PENDING_URLS) >= URL_FLUSH_BATCH:
+        flush_accessed_urls()
 
 # ==============================================================================
 # ENHANCED SEARCH FUNCTIONS
 # ==============================================================================
 
-def search_with_ddgs(search_query: str, backend: str = 'auto') -> Tuple[Optional[str], bool, str]:
+def run_ddgs_text(query: str, backend: str, num_results: int = None) -> List[Dict]:
+    """Run a blocking ddgs text search. Called from a worker thread."""
+    # DDGS caches its engines (and their HTTP clients) per instance, so reuse
+    # one per thread rather than reconnecting for every query
+    ddgs = getattr(DDGS_LOCAL, 'client', None)
+    if ddgs is None:
+        ddgs = DDGS_LOCAL.client = DDGS(timeout=SEARCH_TIMEOUT)
+
+    return ddgs.text(
+        query=query,
+        region='uk-en',
+        safesearch='off',
+        num_results=num_results or NUM_RESULTS,
+        backend=backend
+    )
+
+def record_rate_limit(backend: str, error: Exception) -> bool:
+    """
+    Check whether a search error means the backend is rate limiting us.
+    If so, log it and count it against the backend's failures.
+    """
+    error_msg = str(error).lower()
+    if 'ratelimit' not in error_msg and '202' not in error_msg and '429' not in error_msg:
+        return False
+
+    log_message(f"Rate limit hit for backend {backend}", "WARNING")
+    BACKEND_FAILURES[backend] = BACKEND_FAILURES.get(backend, 0) + 1
+    return True
+
+async def search_with_ddgs(session: aiohttp.ClientSession, search_query: str, backend: str = 'auto') -> Tuple[Optional[str], bool, str]:
     """
     Search using ddgs with specific backend.
     Returns: (url, success, backend_used)
@@ -228,38 +407,25 @@ def search_with_ddgs(search_query: str, backend: str = 'auto') -> Tuple[Optional
     query = f'{search_query} site:argos.co.uk'
     
     try:
-        # Initialize DDGS
-        ddgs = DDGS(timeout=CONFIG['search_timeout'])
-        
-        # Perform text search with specific backend
-        results = ddgs.text(
-            query=query,
-            region='uk-en',
-            safesearch='off',
-            num_results=CONFIG['num_results'],
-            backend=backend
-        )
+        # ddgs is synchronous, so run it in the default thread pool
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, run_ddgs_text, query, backend)
         
         if results:
             # Debug logging
-            if CONFIG.get('debug_search', False):
+            if DEBUG_SEARCH:
                 log_message(f"Search query: {query}", "DEBUG")
                 log_message(f"Found {len(results)} results", "DEBUG")
                 for idx, result in enumerate(results):
                     log_message(f"  Result {idx+1}: {result.get('href', 'No URL')}", "DEBUG")
                     log_message(f"    Title: {result.get('title', 'No title')[:80]}...", "DEBUG")
             
-            # Collect all valid Argos product URLs
-            argos_urls = []
-            for result in results:
-                if 'href' in result:
-                    url = result['href']
-                    # Clean URL - remove tracking parameters
-                    if '?' in url:
-                        url = url.split('?')[0]
-                    
-                    if is_valid_product_url(url) and url not in argos_urls:
-                        argos_urls.append(url)
+            # Collect all valid Argos product URLs (canonicalised, so tracking
+            # parameters are removed), de-duplicated in result order
+            argos_urls = list(dict.fromkeys(
+                url for url in (canonicalize_url(result['href']) for result in results if 'href' in result)
+                if is_valid_product_url(url)
+            ))
             
             # Sequentially check each URL
             if argos_urls:
@@ -274,7 +440,7 @@ def search_with_ddgs(search_query: str, backend: str = 'auto') -> Tuple[Optional
                     log_message(f"Checking URL {idx+1}/{len(argos_urls)}: {url}", "INFO")
                     
                     # Check if product exists (not 404)
-                    if check_product_exists(url):
+                    if await check_product_exists(session, url):
                         # Reset failure count for successful backend
                         if backend in BACKEND_FAILURES:
                             BACKEND_FAILURES[backend] = 0
@@ -293,12 +459,11 @@ def search_with_ddgs(search_query: str, backend: str = 'auto') -> Tuple[Optional
         return None, True, backend
     
     except Exception as e:
-        error_msg = str(e).lower()
-        if 'ratelimit' in error_msg or '202' in error_msg or '429' in error_msg:
-            log_message(f"Rate limit hit for backend {backend}", "WARNING")
-            BACKEND_FAILURES[backend] = BACKEND_FAILURES.get(backend, 0) + 1
+        if record_rate_limit(backend, e):
             return None, False, backend
-        elif 'timeout' in error_msg:
+
+        error_msg = str(e).lower()
+        if 'timeout' in error_msg:
             log_message(f"Timeout for backend {backend}", "WARNING")
             return None, True, backend
         elif 'no results found' in error_msg:
@@ -308,35 +473,79 @@ def search_with_ddgs(search_query: str, backend: str = 'auto') -> Tuple[Optional
             log_message(f"Error with backend {backend}: {str(e)}", "ERROR")
             return None, True, backend
 
-def check_product_exists(url: str) -> bool:
+async def search_with_ddgs_batch(eans: List[str], backend: str) -> Tuple[Dict[str, List[str]], bool]:
+    """
+    Search for several EANs with one combined OR query.
+    Results are matched back to an EAN when it appears in the result's
+    title, snippet or URL.
+    Returns: ({ean: [urls]}, success)
+    """
+    query = ' OR '.join(f'"{ean}"' for ean in eans) + ' site:argos.co.uk'
+    num_results = NUM_RESULTS * len(eans)
+
+    try:
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, run_ddgs_text, query, backend, num_results)
+    except Exception as e:
+        if record_rate_limit(backend, e):
+            return {}, False
+        log_message(f"Batched search error with backend {backend}: {str(e)}", "WARNING")
+        return {}, True
+
+    hits = {}
+    for result in results or []:
+        url = canonicalize_url(result.get('href', ''))
+        if not is_valid_product_url(url):
+            continue
+        text = f"{result.get('title', '')} {result.get('body', '')} {url}"
+        for ean in eans:
+            if ean in text:
+                # dict keys keep result order without repeats
+                hits.setdefault(ean, {})[url] = None
+
+    if DEBUG_SEARCH:
+        log_message(f"Batched query: {query}", "DEBUG")
+        log_message(f"Matched {len(hits)}/{len(eans)} EANs from {len(results or [])} results", "DEBUG")
+
+    return {ean: list(urls) for ean, urls in hits.items()}, True
+
+async def check_product_exists(session: aiohttp.ClientSession, url: str) -> bool:
     """
     Check if a product URL returns 404 or exists.
     Returns True if product exists, False if 404.
+    The body of an existing page is kept for fetch_page_content().
     """
-    # Mark as accessed regardless of result
-    mark_url_accessed(url)
-    
-    try:
-        headers = get_random_headers()
-        response = requests.head(url, headers=headers, timeout=10, allow_redirects=True)
-        
-        if response.status_code == 404:
-            log_message(f"Product page returned 404: {url}", "INFO")
-            return False
-        elif response.status_code == 200:
-            return True
-        else:
-            # For other status codes, try a GET request
-            response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-            if response.status_code == 404:
+    headers = get_random_headers()
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            # Argos often answers HEAD with 200 for removed products, so use
+            # a single GET and only read the body when the page exists
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                status = response.status
+                if status == 200:
+                    PREFETCHED_PAGES[url] = await response.text(errors='replace')
+
+            # Only a definite answer marks the URL; after an error
+            # fetch_page_content() must still be able to fetch it
+            if status in (200, 404):
+                mark_url_accessed(url)
+
+            if status == 404:
                 log_message(f"Product page returned 404: {url}", "INFO")
                 return False
-            return response.status_code == 200
-    except Exception as e:
-        log_message(f"Error checking product existence: {str(e)}", "DEBUG")
-        return True
+            return status == 200
+        except Exception as e:
+            log_message(f"Error checking product existence (attempt {attempt + 1}): {str(e)}", "DEBUG")
 
-def search_argos_direct(model_number: str) -> Optional[str]:
+            if attempt < MAX_RETRIES - 1:
+                await asyncio.sleep(RETRY_DELAY * (BACKOFF_BASE ** attempt))
+
+    # Assume the product exists if it could not be checked (the URL is left
+    # unmarked, so fetch_page_content() fetches it)
+    return True
+
+async def search_argos_direct(session: aiohttp.ClientSession, model_number: str) -> Optional[str]:
     """
     Search directly on Argos website using model number.
     This is less rate limited than external search engines.
@@ -354,31 +563,27 @@ def search_argos_direct(model_number: str) -> Optional[str]:
         # Mark as accessed before making request
         mark_url_accessed(search_url)
         
-        response = requests.get(
-            search_url,
-            headers=headers,
-            timeout=CONFIG['request_timeout'],
-            allow_redirects=True
-        )
+        async with session.get(search_url, headers=headers, allow_redirects=True) as response:
+            status = response.status
+            final_url = str(response.url)
+            page_text = await response.text(errors='replace') if status == 200 else ''
         
-        if response.status_code == 200:
-            final_url = response.url
-            
+        if status == 200:
             # Check if redirected directly to a product page
             if is_valid_product_url(final_url):
                 log_message(f"Direct redirect to product: {final_url}", "SUCCESS")
                 return final_url
             
             # Parse the search results page
-            soup = BeautifulSoup(response.text, 'html.parser')
+            tree = LexborHTMLParser(page_text)
             
             # Look for product links in search results
             product_links = []
             
             # Method 1: Look for product links with specific patterns
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                if re.search(r'/product/\d+', href):
+            for link in tree.css('a[href]'):
+                href = link.attributes.get('href') or ''
+                if _PRODUCT_PATH_RE.search(href):
                     if not href.startswith('http'):
                         href = f"https://www.argos.co.uk{href}"
                     if is_valid_product_url(href) and not has_url_been_accessed(href):
@@ -387,7 +592,7 @@ def search_argos_direct(model_number: str) -> Optional[str]:
             # Method 2: Look for clickSR parameter in URL (as in your example)
             if not product_links and 'clickSR=' in final_url:
                 # Extract the actual product URL from the parameters
-                match = re.search(r'/product/\d+', final_url)
+                match = _PRODUCT_PATH_RE.search(final_url)
                 if match:
                     product_url = f"https://www.argos.co.uk{match.group()}"
                     if is_valid_product_url(product_url) and not has_url_been_accessed(product_url):
@@ -405,10 +610,91 @@ def search_argos_direct(model_number: str) -> Optional[str]:
     
     return None
 
-def find_product_url_enhanced(product_id: str, search_type: str, search_blocked: Dict) -> Tuple[Optional[str], Dict]:
+def get_available_backends(search_blocked: Dict) -> List[str]:
+    """Return the search backends that are not blocked, unblocking any whose cooldown has passed."""
+    available_backends = []
+    for backend in SEARCH_BACKENDS:
+        if backend in search_blocked and search_blocked[backend]:
+            # Check if cooldown period has passed
+            if 'last_block_time' in search_blocked and backend in search_blocked['last_block_time']:
+                time_since_block = time.time() - search_blocked['last_block_time'][backend]
+                if time_since_block >= BLOCK_COOLDOWN:
+                    search_blocked[backend] = False
+                    available_backends.append(backend)
+                    log_message(f"Backend {backend} cooldown passed, unblocking", "INFO")
+            else:
+                continue
+        else:
+            available_backends.append(backend)
+    return available_backends
+
+def mark_backend_blocked(search_blocked: Dict, backend: str):
+    """Record that a backend hit its rate limit."""
+    global CONSECUTIVE_FAILURES
+
+    search_blocked[backend] = True
+    if 'last_block_time' not in search_blocked:
+        search_blocked['last_block_time'] = {}
+    search_blocked['last_block_time'][backend] = block_time = time.time()
+    heapq.heappush(BLOCK_HEAP, (block_time + BLOCK_COOLDOWN, backend))
+    CONSECUTIVE_FAILURES += 1
+
+def next_unblock_wait(search_blocked: Dict) -> float:
+    """
+    Seconds until the next backend's cooldown ends (inf if none is cooling down).
+    Entries that have expired, or were superseded by a later block of the
+    same backend, are popped off BLOCK_HEAP as they reach the top.
+    """
+    last_block_time = search_blocked.get('last_block_time', {})
+    now = time.time()
+    while BLOCK_HEAP:
+        expiry, backend = BLOCK_HEAP[0]
+        if expiry > now and expiry == last_block_time.get(backend, 0) + BLOCK_COOLDOWN:
+            return expiry - now
+        heapq.heappop(BLOCK_HEAP)
+    return float('inf')
+
+async def prefetch_ean_urls(eans: List[str], search_blocked: Dict) -> Dict[str, List[str]]:
+    """
+    Search for EANs in batches of CONFIG['ean_batch_size'] before the
+    per-product pipeline starts. Returns candidate URLs per EAN; EANs
+    without candidates fall back to their own search later.
+    """
+    batch_size = CONFIG['ean_batch_size']
+    if batch_size < 2 or len(eans) < 2:
+        return {}
+
+    candidates = {}
+    sem = asyncio.BoundedSemaphore(CONFIG['max_concurrency'])
+
+    async def search_batch(batch):
+        available_backends = get_available_backends(search_blocked)
+        if not available_backends:
+            return
+        backend = random.choice(available_backends)
+
+        await adaptive_delay(backend)
+        hits, success = await search_with_ddgs_batch(batch, backend)
+
+        if not success:
+            mark_backend_blocked(search_blocked, backend)
+            return
+        for ean, urls in hits.items():
+            candidates.setdefault(ean, []).extend(urls)
+
+    batches = [eans[i:i + batch_size] for i in range(0, len(eans), batch_size)]
+    log_message(f"Searching {len(eans)} EANs in {len(batches)} batched queries")
+    await asyncio.gather(*[task_limiter(sem, search_batch(batch)) for batch in batches])
+    log_message(f"Batched search found candidate URLs for {len(candidates)}/{len(eans)} EANs")
+
+    return candidates
+
+async def find_product_url_enhanced(session: aiohttp.ClientSession, product_id: str, search_type: str, search_blocked: Dict,
+                                    candidate_urls: Optional[List[str]] = None) -> Tuple[Optional[str], Dict]:
     """
     Enhanced product URL finder.
     search_type: 'ean' or 'model'
+    candidate_urls: URLs already found for this EAN by a batched search
     """
     global CONSECUTIVE_FAILURES
     
@@ -416,21 +702,17 @@ def find_product_url_enhanced(product_id: str, search_type: str, search_blocked:
     
     # Strategy 1: For EAN codes, use search engine rotation
     if search_type == 'ean':
+        # Check candidates from the batched search first
+        for url in candidate_urls or []:
+            if has_url_been_accessed(url):
+                continue
+            if await check_product_exists(session, url):
+                log_message(f"Found URL via batched search: {url}", "SUCCESS")
+                CONSECUTIVE_FAILURES = 0
+                return url, search_blocked
+
         # Get available backends
-        available_backends = []
-        for backend in CONFIG['search_backends']:
-            if backend in search_blocked and search_blocked[backend]:
-                # Check if cooldown period has passed
-                if 'last_block_time' in search_blocked and backend in search_blocked['last_block_time']:
-                    time_since_block = time.time() - search_blocked['last_block_time'][backend]
-                    if time_since_block >= CONFIG['block_cooldown']:
-                        search_blocked[backend] = False
-                        available_backends.append(backend)
-                        log_message(f"Backend {backend} cooldown passed, unblocking", "INFO")
-                else:
-                    continue
-            else:
-                available_backends.append(backend)
+        available_backends = get_available_backends(search_blocked)
         
         # Shuffle backends
         random.shuffle(available_backends)
@@ -442,17 +724,13 @@ def find_product_url_enhanced(product_id: str, search_type: str, search_blocked:
         for backend in available_backends:
             log_message(f"Trying backend: {backend}")
             
-            adaptive_delay(backend)
+            await adaptive_delay(backend)
             
-            url, success, used_backend = search_with_ddgs(product_id, backend)
+            url, success, used_backend = await search_with_ddgs(session, product_id, backend)
             
             if not success:
                 # Backend hit rate limit
-                search_blocked[backend] = True
-                if 'last_block_time' not in search_blocked:
-                    search_blocked['last_block_time'] = {}
-                search_blocked['last_block_time'][backend] = time.time()
-                CONSECUTIVE_FAILURES += 1
+                mark_backend_blocked(search_blocked, backend)
                 continue
             
             if url:
@@ -469,9 +747,9 @@ def find_product_url_enhanced(product_id: str, search_type: str, search_blocked:
     elif search_type == 'model':
         log_message(f"Using Argos direct search for model: {product_id}")
         
-        adaptive_delay('argos', is_argos_search=True)
+        await adaptive_delay('argos', is_argos_search=True)
         
-        url = search_argos_direct(product_id)
+        url = await search_argos_direct(session, product_id)
         
         if url:
             log_message(f"Found URL via Argos search: {url}", "SUCCESS")
@@ -488,22 +766,153 @@ def find_product_url_enhanced(product_id: str, search_type: str, search_blocked:
 # PERSISTENCE FUNCTIONS
 # ==============================================================================
 
+def read_state_log(path: str) -> List:
+    """Read every value from an append-only JSONL state log."""
+    values = []
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A partial last line is left behind if a run was killed mid-write
+                continue
+    return values
+
+def append_state_log(key: str, value):
+    """Append one value to the state log for the given CONFIG file key."""
+    handle = STATE_LOGS.get(key)
+    if handle is None:
+        return
+    try:
+        handle.write(json.dumps(value).encode('utf-8') + b'\n')
+    except Exception as e:
+        log_message(f"Error writing to {CONFIG[key]}: {str(e)}", "ERROR")
+
+def record_product(products: set, key: str, product_id: str):
+    """Add a product to a state set and append it to that set's log."""
+    if product_id in products:
+        return
+    products.add(product_id)
+    append_state_log(key, product_id)
+
+def open_state_logs():
+    """Open the append-only state logs, closing them again at exit."""
+    for key in ('success_file', 'not_found_file'):
+        if key not in STATE_LOGS:
+            STATE_LOGS[key] = open(CONFIG[key], 'ab')
+    atexit.register(close_state_logs)
+
+def close_state_logs():
+    """Flush and close the append-only state logs."""
+    while STATE_LOGS:
+        _, handle = STATE_LOGS.popitem()
+        try:
+            handle.close()
+        except Exception:
+            pass
+
+def open_url_db():
+    """Open the accessed URL database in WAL mode, closing it again at exit."""
+    global URL_DB
+
+    # run_async() may drive the scraper from a worker thread; the connection
+    # is still only used by one thread at a time
+    URL_DB = sqlite3.connect(CONFIG['accessed_urls_file'], check_same_thread=False)
+    URL_DB.execute('PRAGMA journal_mode=WAL')
+    URL_DB.execute('CREATE TABLE IF NOT EXISTS accessed_urls (url TEXT PRIMARY KEY)')
+    URL_DB.commit()
+    atexit.register(close_url_db)
+
+def flush_accessed_urls():
+    """Write buffered accessed URLs to the database in one transaction."""
+    if URL_DB is None or not PENDING_URLS:
+        return
+    try:
+        with URL_DB:
+            URL_DB.executemany('INSERT OR IGNORE INTO accessed_urls (url) VALUES (?)',
+                               [(url,) for url in PENDING_URLS])
+        PENDING_URLS.clear()
+    except sqlite3.Error as e:
+        log_message(f"Error saving accessed URLs: {str(e)}", "ERROR")
+
+def count_accessed_urls() -> int:
+    """Return the number of URLs accessed across all runs."""
+    flush_accessed_urls()
+    if URL_DB is None:
+        return len(PENDING_URLS)
+    return URL_DB.execute('SELECT COUNT(*) FROM accessed_urls').fetchone()[0]
+
+def close_url_db():
+    """Flush pending URLs and close the accessed URL database."""
+    global URL_DB
+
+    if URL_DB is None:
+        return
+    flush_accessed_urls()
+    URL_DB.close()
+    URL_DB = None
+
+def legacy_state_path(key: str) -> str:
+    """Path the given CONFIG file key had when state was pickled (same name, .pkl)."""
+    return os.path.splitext(CONFIG[key])[0] + '.pkl'
+
+def migrate_pickled_state_log(key: str):
+    """
+    One-time migration of a pickled product set from older versions into its
+    JSONL state log. Only runs while the log does not exist yet.
+    """
+    legacy_path = legacy_state_path(key)
+    if os.path.exists(CONFIG[key]) or not os.path.exists(legacy_path):
+        return
+
+    try:
+        with open(legacy_path, 'rb') as f:
+            values = pickle.load(f)
+
+        # Write to a temporary file first so a failed migration can be retried
+        temp_path = CONFIG[key] + '.tmp'
+        with open(temp_path, 'wb') as f:
+            for value in values:
+                f.write(json.dumps(value).encode('utf-8') + b'\n')
+        os.replace(temp_path, CONFIG[key])
+        log_message(f"Migrated {len(values)} entries from {legacy_path} to {CONFIG[key]}")
+    except Exception as e:
+        log_message(f"Error migrating {legacy_path}: {str(e)}", "WARNING")
+
+def migrate_pickled_urls(legacy_path: str):
+    """One-time migration of a pickled accessed URL set into the URL database."""
+    try:
+        with open(legacy_path, 'rb') as f:
+            urls = pickle.load(f)
+
+        with URL_DB:
+            URL_DB.executemany('INSERT OR IGNORE INTO accessed_urls (url) VALUES (?)',
+                               [(canonicalize_url(url),) for url in urls])
+        log_message(f"Migrated {len(urls)} accessed URLs from {legacy_path}")
+    except Exception as e:
+        log_message(f"Error migrating {legacy_path}: {str(e)}", "WARNING")
+
 def load_persistent_data():
     """Load successful and not found product lists from disk."""
     successful_products = set()
     not_found_products = set()
     search_blocked = {}
-    accessed_urls = set()
     
     # Initialize backend tracking
     for backend in CONFIG['search_backends']:
         search_blocked[backend] = False
 
+    # Carry over state pickled by older versions
+    migrate_pickled_state_log('success_file')
+    migrate_pickled_state_log('not_found_file')
+
     # Load successful products
     if os.path.exists(CONFIG['success_file']):
         try:
-            with open(CONFIG['success_file'], 'rb') as f:
-                successful_products = pickle.load(f)
+            successful_products = set(read_state_log(CONFIG['success_file']))
             log_message(f"Loaded {len(successful_products)} previously successful products")
         except Exception as e:
             log_message(f"Error loading successful products: {str(e)}", "WARNING")
@@ -511,8 +920,7 @@ def load_persistent_data():
     # Load not found products
     if os.path.exists(CONFIG['not_found_file']):
         try:
-            with open(CONFIG['not_found_file'], 'rb') as f:
-                not_found_products = pickle.load(f)
+            not_found_products = set(read_state_log(CONFIG['not_found_file']))
             log_message(f"Loaded {len(not_found_products)} products not found on Argos")
         except Exception as e:
             log_message(f"Error loading not found products: {str(e)}", "WARNING")
@@ -525,49 +933,56 @@ def load_persistent_data():
                 for key, value in loaded_blocked.items():
                     if key in search_blocked or key == 'last_block_time':
                         search_blocked[key] = value
-        except Exception as e:
-            log_message(f"Error loading blocked status: {str(e)}", "WARNING")
 
-    # Load accessed URLs
-    if os.path.exists(CONFIG['accessed_urls_file']):
-        try:
-            with open(CONFIG['accessed_urls_file'], 'rb') as f:
-                accessed_urls = pickle.load(f)
-            log_message(f"Loaded {len(accessed_urls)} previously accessed URLs")
+            # Seed the cooldown heap with the blocks carried over from the last run
+            BLOCK_HEAP.clear()
+            for backend, block_time in search_blocked.get('last_block_time', {}).items():
+                if backend in SEARCH_BACKENDS:
+                    heapq.heappush(BLOCK_HEAP, (block_time + BLOCK_COOLDOWN, backend))
         except Exception as e:
-            log_message(f"Error loading accessed URLs: {str(e)}", "WARNING")
-    
-    # Update global accessed URLs
-    global ACCESSED_URLS
-    ACCESSED_URLS = accessed_urls
-
-    return successful_products, not_found_products, search_blocked
+            log_message(f"Error loading blocked status: {str(e)}", "WARNING")
 
-def save_persistent_data(successful_products, not_found_products, search_blocked):
-    """Save successful and not found product lists to disk."""
+    # Open accessed URLs (looked up on demand, nothing to load)
+    legacy_urls_path = legacy_state_path('accessed_urls_file')
+    migrate_urls = not os.path.exists(CONFIG['accessed_urls_file']) and os.path.exists(legacy_urls_path)
     try:
-        with open(CONFIG['success_file'], 'wb') as f:
-            pickle.dump(successful_products, f)
-    except Exception as e:
-        log_message(f"Error saving successful products: {str(e)}", "ERROR")
+        open_url_db()
+        if migrate_urls:
+            migrate_pickled_urls(legacy_urls_path)
+    except sqlite3.Error as e:
+        log_message(f"Error opening accessed URLs database: {str(e)}", "WARNING")
 
+    # New entries are appended to the logs as they happen
     try:
-        with open(CONFIG['not_found_file'], 'wb') as f:
-            pickle.dump(not_found_products, f)
+        open_state_logs()
     except Exception as e:
-        log_message(f"Error saving not found products: {str(e)}", "ERROR")
+        log_message(f"Error opening state logs: {str(e)}", "ERROR")
 
-    try:
-        with open(CONFIG['blocked_status_file'], 'w') as f:
-            json.dump(search_blocked, f, indent=2)
-    except Exception as e:
-        log_message(f"Error saving blocked status: {str(e)}", "ERROR")
+    return successful_products, not_found_products, search_blocked
+
+def save_persistent_data(search_blocked, sync: bool = False):
+    """
+    Flush the state logs and save the search blocked status to disk.
+    With sync=True (the final save) the files are also fsynced.
+    """
+    flush_accessed_urls()
+
+    for key, handle in STATE_LOGS.items():
+        try:
+            handle.flush()
+            if sync:
+                os.fsync(handle.fileno())
+        except Exception as e:
+            log_message(f"Error flushing {CONFIG[key]}: {str(e)}", "ERROR")
 
     try:
-        with open(CONFIG['accessed_urls_file'], 'wb') as f:
-            pickle.dump(ACCESSED_URLS, f)
+        with open(CONFIG['blocked_status_file'], 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(search_blocked, option=orjson.OPT_INDENT_2))
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
     except Exception as e:
-        log_message(f"Error saving accessed URLs: {str(e)}", "ERROR")
+        log_message(f"Error saving blocked status: {str(e)}", "ERROR")
 
 # ==============================================================================
 # ENVIRONMENT AND DATA FUNCTIONS
@@ -589,80 +1004,105 @@ def setup_environment():
             ['', 'CHP61.100WH'],
             ['0622356316101', 'ABC789']
         ]
-        df = pd.DataFrame(sample_data, columns=['EAN', 'Model'])
-        df.to_csv(CONFIG['input_csv'], index=False)
+        with open(CONFIG['input_csv'], 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['EAN', 'Model'])
+            writer.writerows(sample_data)
         log_message(f"Sample file created with {len(sample_data)} products")
 
-def fetch_page_content(url, retry_count=0):
-    """Fetch page content with retry logic."""
+async def fetch_page_content(session: aiohttp.ClientSession, url):
+    """Fetch page content, retrying with exponential backoff."""
+    # Reuse the body downloaded by check_product_exists()
+    html_content = PREFETCHED_PAGES.pop(url, None)
+    if html_content is not None:
+        return html_content
+
     # Skip if already accessed
     if has_url_been_accessed(url):
         log_message(f"Skipping already accessed URL: {url}", "INFO")
         return None
     
-    # Mark as accessed
-    mark_url_accessed(url)
-    
-    try:
-        headers = get_random_headers()
-        
-        response = requests.get(
-            url,
-            headers=headers,
-            timeout=CONFIG['request_timeout']
-        )
-        response.raise_for_status()
-        return response.text
+    headers = get_random_headers()
 
-    except requests.exceptions.RequestException as e:
-        log_message(f"Request failed (attempt {retry_count + 1}): {str(e)}", "ERROR")
+    for attempt in range(MAX_RETRIES):
+        try:
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                # Decode leniently; a stray invalid byte shouldn't lose the page
+                html_content = await response.text(errors='replace')
 
-        if retry_count < CONFIG['max_retries'] - 1:
-            time.sleep(CONFIG['retry_delay'])
-            return fetch_page_content(url, retry_count + 1)
+            # Only mark once the page was actually fetched
+            mark_url_accessed(url)
+            return html_content
 
-        return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log_message(f"Request failed (attempt {attempt + 1}): {str(e)}", "ERROR")
+
+            if attempt < MAX_RETRIES - 1:
+                await asyncio.sleep(RETRY_DELAY * (BACKOFF_BASE ** attempt))
+
+    return None
+
+def slice_script_data(script_content):
+    """
+    Fast path for the known `window.__data = {...};` shape using str.find
+    instead of a DOTALL regex. Returns None when the shape doesn't match.
+    """
+    for marker in _SCRIPT_DATA_MARKERS:
+        # The marker can also prefix other names (e.g. window.__dataLayer),
+        # so try each occurrence in turn
+        marker_index = script_content.find(marker)
+        while marker_index != -1:
+            start_index = script_content.find('{', marker_index)
+            if start_index == -1:
+                break
+
+            # Only whitespace around '=' may sit between the marker and the object
+            if script_content[marker_index + len(marker):start_index].strip() == '=':
+                end_index = script_content.find('};', start_index)
+                if end_index == -1:
+                    break
+                return script_content[start_index:end_index + 1]
+
+            marker_index = script_content.find(marker, marker_index + 1)
+
+    return None
 
 def extract_product_data(html_content):
     """Extract product data from the page HTML."""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        tree = LexborHTMLParser(html_content)
 
-        # Try multiple methods to find product data
-        script_tag = soup.find('script', string=lambda t: t and 'window.__data' in t)
+        # Try multiple methods to find product data (inline scripts only)
+        inline_scripts = [node.text() for node in tree.css('script:not([src])')]
 
-        if not script_tag:
-            script_tag = soup.find('script', string=lambda t: t and 'window.__PRELOADED_STATE__' in t)
+        script_content = next((t for t in inline_scripts if 'window.__data' in t), None)
 
-        if not script_tag:
-            json_ld_scripts = soup.find_all('script', type='application/ld+json')
-            for script in json_ld_scripts:
+        if not script_content:
+            script_content = next((t for t in inline_scripts if 'window.__PRELOADED_STATE__' in t), None)
+
+        if not script_content:
+            for script in tree.css('script[type="application/ld+json"]'):
                 try:
-                    data = json.loads(script.string)
+                    data = orjson.loads(script.text())
                     if '@type' in data and data['@type'] == 'Product':
                         log_message("Found product data in JSON-LD format", "INFO")
                         return {'product': data}
                 except:
                     continue
 
-        if not script_tag:
+        if not script_content:
             log_message("No product data script found on page", "WARNING")
             return None
 
-        script_content = script_tag.string
-
-        patterns = [
-            (r'window\.__data\s*=\s*({.*?});', 1),
-            (r'window\.__PRELOADED_STATE__\s*=\s*({.*?});', 1),
-            (r'=\s*({.*})\s*;?\s*$', 1)
-        ]
+        json_string = slice_script_data(script_content)
 
-        json_string = None
-        for pattern, group in patterns:
-            match = re.search(pattern, script_content, re.DOTALL)
-            if match:
-                json_string = match.group(group)
-                break
+        if not json_string:
+            for pattern in _SCRIPT_DATA_RES:
+                match = pattern.search(script_content)
+                if match:
+                    json_string = match.group(1)
+                    break
 
         if not json_string:
             start_index = script_content.find('{')
@@ -676,10 +1116,10 @@ def extract_product_data(html_content):
 
         # Clean and parse JSON
         json_string = json_string.replace(':undefined', ':null')
-        json_string = re.sub(r',\s*}', '}', json_string)
-        json_string = re.sub(r',\s*]', ']', json_string)
+        json_string = _TRAILING_COMMA_OBJ_RE.sub('}', json_string)
+        json_string = _TRAILING_COMMA_ARR_RE.sub(']', json_string)
 
-        data = json.loads(json_string)
+        data = orjson.loads(json_string)
         log_message("Successfully extracted product data", "SUCCESS")
         return data
 
@@ -690,15 +1130,17 @@ def extract_product_data(html_content):
 
     return None
 
-def scrape_product(product_id, url):
+async def scrape_product(session: aiohttp.ClientSession, product_id, url):
     """Scrape product data from the given URL."""
     log_message(f"Scraping product data from: {url}")
 
-    html_content = fetch_page_content(url)
+    html_content = await fetch_page_content(session, url)
     if not html_content:
         return None
 
-    product_data = extract_product_data(html_content)
+    # Parse in a worker process so the event loop keeps fetching
+    loop = asyncio.get_running_loop()
+    product_data = await loop.run_in_executor(PARSE_EXECUTOR, extract_product_data, html_content)
     if not product_data:
         return None
 
@@ -706,8 +1148,8 @@ def scrape_product(product_id, url):
     output_path = os.path.join(CONFIG['output_directory'], f"{safe_id}.json")
 
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(product_data, f, ensure_ascii=False, indent=4)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(product_data, option=orjson.OPT_INDENT_2))
 
         log_message(f"Saved product data to: {output_path}", "SUCCESS")
         return True
@@ -719,30 +1161,43 @@ def scrape_product(product_id, url):
 def load_products():
     """Load products from the CSV file with EAN and Model columns."""
     try:
-        # Read CSV with headers
-        products_df = pd.read_csv(CONFIG['input_csv'], dtype=str)
-        
-        # Check if required columns exist
-        if 'EAN' not in products_df.columns or 'Model' not in products_df.columns:
-            log_message("CSV must have 'EAN' and 'Model' columns", "ERROR")
-            return []
-        
-        # Replace NaN with empty strings
-        products_df = products_df.fillna('')
-        
-        # Create list of tuples (product_id, search_type)
-        products = []
-        for _, row in products_df.iterrows():
-            ean = str(row['EAN']).strip()
-            model = str(row['Model']).strip()
+        # Read CSV with headers (utf-8-sig drops the BOM Excel adds)
+        with open(CONFIG['input_csv'], 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
             
-            # Priority: use EAN if available, otherwise use model
-            if ean:
-                products.append((ean, 'ean'))
-            elif model:
-                products.append((model, 'model'))
-            else:
-                log_message(f"Row {_ + 1} has neither EAN nor Model, skipping", "WARNING")
+            # Check if required columns exist
+            if 'EAN' not in header or 'Model' not in header:
+                log_message("CSV must have 'EAN' and 'Model' columns", "ERROR")
+                return []
+            
+            # Resolve column positions once instead of building a dict per row
+            ean_index = header.index('EAN')
+            model_index = header.index('Model')
+            
+            # Create list of tuples (product_id, search_type)
+            products = []
+            for row_number, row in enumerate(reader, 1):
+                if not row:
+                    continue  # blank line, as DictReader would skip
+                
+                ean = row[ean_index].strip() if ean_index < len(row) else ''
+                if ean:
+                    # Priority: use EAN if available, otherwise use model
+                    products.append((ean, 'ean'))
+                    continue
+                
+                model = row[model_index].strip() if model_index < len(row) else ''
+                if model:
+                    products.append((model, 'model'))
+                else:
+                    log_message(f"Row {row_number} has neither EAN nor Model, skipping", "WARNING")
+        
+        # Drop repeated rows so each product is only searched once
+        unique_products = list(dict.fromkeys(products))
+        if len(unique_products) < len(products):
+            log_message(f"Skipped {len(products) - len(unique_products)} duplicate rows", "INFO")
+        products = unique_products
         
         log_message(f"Loaded {len(products)} products from CSV", "INFO")
         
@@ -761,14 +1216,162 @@ def load_products():
 
     return []
 
+def filter_products(products, successful_products, not_found_products):
+    """
+    Drop products already settled by earlier runs, before any search or delay
+    is spent on them. Returns (products_to_process, skipped_successful, skipped_not_found).
+    """
+    # Work out what to skip with set operations, then filter in one pass
+    product_ids = {product_id for product_id, _ in products}
+    skipped_successful = set() if CONFIG['rescrape_successful'] else product_ids & successful_products
+    skipped_not_found = (product_ids & not_found_products) - skipped_successful
+    excluded = skipped_successful | skipped_not_found
+
+    products_to_process = [product for product in products if product[0] not in excluded]
+
+    return products_to_process, len(skipped_successful), len(skipped_not_found)
+
 # ==============================================================================
 # MAIN EXECUTION
 # ==============================================================================
 
+async def task_limiter(sem: asyncio.BoundedSemaphore, coro):
+    """Run a coroutine once a slot in the semaphore is free."""
+    async with sem:
+        return await coro
+
+async def process_product(session: aiohttp.ClientSession, index: int, total: int, product_id: str, search_type: str,
+                          successful_products, not_found_products, search_blocked: Dict, stats: Dict,
+                          candidate_urls: Optional[List[str]] = None):
+    """
+    Process one product. Unexpected errors are logged and counted as a
+    failure so a single bad page cannot stop the other tasks.
+    """
+    try:
+        await handle_product(session, index, total, product_id, search_type,
+                             successful_products, not_found_products, search_blocked, stats, candidate_urls)
+    except Exception as e:
+        log_message(f"Unexpected error processing {product_id}: {type(e).__name__}: {str(e)}", "ERROR")
+        stats['failed'] += 1
+
+async def handle_product(session: aiohttp.ClientSession, index: int, total: int, product_id: str, search_type: str,
+                         successful_products, not_found_products, search_blocked: Dict, stats: Dict,
+                         candidate_urls: Optional[List[str]] = None):
+    """Find, scrape and record a single product."""
+    global CONSECUTIVE_FAILURES
+
+    if stats['stop']:
+        return
+
+    log_message(f"\nProcessing product {index}/{total}: {product_id} ({search_type})")
+    log_message("-" * 50)
+
+    # Check if too many consecutive failures
+    if CONSECUTIVE_FAILURES >= 10:
+        async with STATE_LOCK:
+            # Re-check: another task may have served the cooldown while we waited
+            if CONSECUTIVE_FAILURES >= 10:
+                log_message("Too many consecutive failures, implementing long cooldown...", "WARNING")
+                await adaptive_delay(None, True)
+                CONSECUTIVE_FAILURES = 0
+
+    # Find product URL
+    product_url, search_blocked = await find_product_url_enhanced(session, product_id, search_type, search_blocked,
+                                                                  candidate_urls)
+
+    if not product_url:
+        # Check if all backends are blocked (only relevant for EAN searches)
+        if search_type == 'ean':
+            all_blocked = all(search_blocked.get(backend, False) 
+                            for backend in SEARCH_BACKENDS)
+            if all_blocked:
+                log_message("All search backends are blocked, waiting for cooldown", "ERROR")
+                save_persistent_data(search_blocked)
+                
+                # Calculate minimum wait time
+                min_wait_time = next_unblock_wait(search_blocked)
+                
+                if min_wait_time < float('inf'):
+                    log_message(f"Minimum wait time: {min_wait_time/60:.1f} minutes", "INFO")
+                    if min_wait_time > 300:
+                        log_message("Consider resuming the script later", "INFO")
+                        stats['stop'] = True
+                return
+        
+        # Product not found
+        record_product(not_found_products, 'not_found_file', product_id)
+        stats['not_found'] += 1
+        return
+
+    # Add delay before scraping (not needed if the page is already downloaded)
+    if index > 1 and product_url not in PREFETCHED_PAGES:
+        await adaptive_delay('scrape', False)
+
+    # Scrape product
+    if await scrape_product(session, product_id, product_url):
+        record_product(successful_products, 'success_file', product_id)
+        stats['successful'] += 1
+    else:
+        stats['failed'] += 1
+
+    # Save persistent data periodically
+    if time.monotonic() - stats['last_save'] >= CONFIG['checkpoint_interval']:
+        save_persistent_data(search_blocked)
+        stats['last_save'] = time.monotonic()
+
+async def run_scraper(products_to_process, successful_products, not_found_products, search_blocked: Dict) -> Dict:
+    """Process all products concurrently, bounded by CONFIG['max_concurrency']."""
+    global PARSE_EXECUTOR, STATE_LOCK
+
+    STATE_LOCK = asyncio.Lock()
+    stats = {'successful': 0, 'failed': 0, 'not_found': 0, 'stop': False, 'last_save': time.monotonic()}
+    sem = asyncio.BoundedSemaphore(CONFIG['max_concurrency'])
+    total = len(products_to_process)
+
+    # Start the parse workers now, before any search threads exist, so
+    # forking them is safe
+    PARSE_EXECUTOR = ProcessPoolExecutor(max_workers=CONFIG['parse_workers'])
+    PARSE_EXECUTOR.submit(int).result()
+
+    try:
+        # Look EANs up in batches first; misses get their own search later
+        eans = [product_id for product_id, search_type in products_to_process if search_type == 'ean']
+        ean_candidates = await prefetch_ean_urls(eans, search_blocked)
+
+        async with create_http_session() as session:
+            await asyncio.gather(*[
+                task_limiter(sem, process_product(session, i, total, product_id, search_type,
+                                                  successful_products, not_found_products, search_blocked, stats,
+                                                  ean_candidates.get(product_id)))
+                for i, (product_id, search_type) in enumerate(products_to_process, 1)
+            ])
+    finally:
+        PARSE_EXECUTOR.shutdown()
+        PARSE_EXECUTOR = None
+
+    return stats
+
+def run_async(coro):
+    """
+    Run a coroutine to completion from synchronous code, on uvloop when it is
+    installed. Inside an already running event loop (a Jupyter/Colab cell)
+    asyncio.run() is not allowed, so the coroutine gets a fresh standard loop
+    in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        run = uvloop.run if uvloop is not None else asyncio.run
+        return run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
 def main():
     """Main execution function."""
-    global CONSECUTIVE_FAILURES
-    
+    bind_config()
+    setup_logging()
+
     log_message("=" * 70)
     log_message("Enhanced Argos Product Data Scraper - Starting")
     log_message("Supports both EAN codes and Model numbers")
@@ -790,18 +1393,8 @@ def main():
         return
 
     # Filter products based on user preferences and previous results
-    products_to_process = []
-    skipped_successful = 0
-    skipped_not_found = 0
-
-    for product_id, search_type in products:
-        if product_id in successful_products and not CONFIG['rescrape_successful']:
-            skipped_successful += 1
-            continue
-        if product_id in not_found_products:
-            skipped_not_found += 1
-            continue
-        products_to_process.append((product_id, search_type))
+    products_to_process, skipped_successful, skipped_not_found = filter_products(
+        products, successful_products, not_found_products)
 
     log_message(f"Products to process: {len(products_to_process)}")
     log_message(f"Skipped (already successful): {skipped_successful}")
@@ -811,94 +1404,35 @@ def main():
         log_message("No new products to process", "INFO")
         return
 
-    # Process statistics
-    successful = 0
-    failed = 0
-    not_found = 0
-
-    # Process each product
-    for i, (product_id, search_type) in enumerate(products_to_process, 1):
-        log_message(f"\nProcessing product {i}/{len(products_to_process)}: {product_id} ({search_type})")
-        log_message("-" * 50)
-
-        # Check if too many consecutive failures
-        if CONSECUTIVE_FAILURES >= 10:
-            log_message("Too many consecutive failures, implementing long cooldown...", "WARNING")
-            adaptive_delay(None, True)
-            CONSECUTIVE_FAILURES = 0
-
-        # Find product URL
-        product_url, search_blocked = find_product_url_enhanced(product_id, search_type, search_blocked)
-
-        if not product_url:
-            # Check if all backends are blocked (only relevant for EAN searches)
-            if search_type == 'ean':
-                all_blocked = all(search_blocked.get(backend, False) 
-                                for backend in CONFIG['search_backends'])
-                if all_blocked:
-                    log_message("All search backends are blocked, waiting for cooldown", "ERROR")
-                    save_persistent_data(successful_products, not_found_products, search_blocked)
-                    
-                    # Calculate minimum wait time
-                    min_wait_time = float('inf')
-                    for backend in CONFIG['search_backends']:
-                        if backend in search_blocked.get('last_block_time', {}):
-                            time_since_block = time.time() - search_blocked['last_block_time'][backend]
-                            time_remaining = CONFIG['block_cooldown'] - time_since_block
-                            if time_remaining > 0 and time_remaining < min_wait_time:
-                                min_wait_time = time_remaining
-                    
-                    if min_wait_time < float('inf'):
-                        log_message(f"Minimum wait time: {min_wait_time/60:.1f} minutes", "INFO")
-                        if min_wait_time > 300:
-                            log_message("Consider resuming the script later", "INFO")
-                            break
-                    continue
-            
-            # Product not found
-            not_found_products.add(product_id)
-            not_found += 1
-            continue
-
-        # Add delay before scraping
-        if i > 1:
-            adaptive_delay('scrape', False)
-
-        # Scrape product
-        if scrape_product(product_id, product_url):
-            successful_products.add(product_id)
-            successful += 1
-        else:
-            failed += 1
-
-        # Save persistent data periodically
-        if i % 5 == 0:
-            save_persistent_data(successful_products, not_found_products, search_blocked)
-
-    # Final save of persistent data
-    save_persistent_data(successful_products, not_found_products, search_blocked)
+    # Process products concurrently
+    try:
+        stats = run_async(run_scraper(products_to_process, successful_products, not_found_products, search_blocked))
+    finally:
+        # Final save of persistent data, also when the run is interrupted
+        save_persistent_data(search_blocked, sync=True)
 
     # Summary
     log_message("\n" + "=" * 70)
     log_message("Scraping Complete - Summary")
     log_message(f"Total products processed: {len(products_to_process)}")
-    log_message(f"Successful: {successful}")
-    log_message(f"Failed: {failed}")
-    log_message(f"Not found on Argos: {not_found}")
+    log_message(f"Successful: {stats['successful']}")
+    log_message(f"Failed: {stats['failed']}")
+    log_message(f"Not found on Argos: {stats['not_found']}")
     log_message(f"Total successful (all time): {len(successful_products)}")
     log_message(f"Total not found (all time): {len(not_found_products)}")
-    log_message(f"Total URLs accessed: {len(ACCESSED_URLS)}")
+    log_message(f"Total URLs accessed: {count_accessed_urls()}")
     log_message("=" * 70)
 
     # Backend status report (for EAN searches)
     log_message("\nBackend Status Report (for EAN searches):")
-    for backend in CONFIG['search_backends']:
+    last_block_time = search_blocked.get('last_block_time', {})
+    now = time.time()
+    for backend in SEARCH_BACKENDS:
         status = "BLOCKED" if search_blocked.get(backend, False) else "AVAILABLE"
         failures = BACKEND_FAILURES.get(backend, 0)
         
-        if status == "BLOCKED" and 'last_block_time' in search_blocked and backend in search_blocked['last_block_time']:
-            time_since_block = time.time() - search_blocked['last_block_time'][backend]
-            time_remaining = max(0, CONFIG['block_cooldown'] - time_since_block)
+        if status == "BLOCKED" and backend in last_block_time:
+            time_remaining = max(0, BLOCK_COOLDOWN - (now - last_block_time[backend]))
             log_message(f"  {backend}: {status} (failures: {failures}, cooldown: {time_remaining/60:.1f} min remaining)")
         else:
             log_message(f"  {backend}: {status} (failures: {failures})")
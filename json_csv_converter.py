@@ -10,13 +10,13 @@
 #
 # How it works:
 # 1. Scans the 'scraped_data' directory for all files ending with .json.
-# 2. Iterates through each JSON file and loads its content.
+# 2. Loads each new or changed JSON file's content, spread across a pool of
+#    worker processes. Rows for unchanged files come from 'parse_cache.sqlite'.
 # 3. For each product, it extracts the required fields, handling cases where
 #    optional data (like a 'was' price) might be missing.
 # 4. It constructs the full product URL using the 'partNumber'.
-# 5. All the extracted data is collected into a list.
-# 6. This list is converted into a Pandas DataFrame for easy handling.
-# 7. The DataFrame is saved to 'argos_products.csv'.
+# 5. Each extracted row is written straight to 'argos_products.csv' as it
+#    arrives, so the whole data set is never held in memory.
 #
 # Instructions for Google Colab:
 # 1. Make sure you have already run the 'argos_scraper_colab' script and that
@@ -29,13 +29,41 @@
 # ==============================================================================
 
 import os
-import json
-import pandas as pd
+import csv
+import hashlib
+import sqlite3
+import orjson
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import date
+from itertools import islice
+from operator import itemgetter
 
 # --- Configuration ---
 INPUT_DIRECTORY = 'scraped_products'
 OUTPUT_CSV_FILE = 'output.csv'
+PARSE_CACHE_FILE = 'parse_cache.sqlite'  # Rows from earlier runs, reused for unchanged files
+CSV_WRITE_BATCH = 1000  # Rows handed to the CSV writer per call
+USE_THREADS = False  # Parse with a thread pool instead of processes (lighter where forking is costly, e.g. Colab)
+PARSE_THREADS = 16  # Worker threads when USE_THREADS is set
+
+PRODUCT_URL_PREFIX = 'https://www.argos.co.uk/product/'
+
+# Shared stand-in for missing JSON sections; only ever read, never modified
+_EMPTY = {}
+
+# File names store '/' in search terms as '_'
+_SEARCH_TERM_TABLE = str.maketrans('_', '/')
+
+# Column order for the CSV, searchTerm first
+CSV_COLUMNS = ('searchTerm', 'timestamp', 'productName', 'description',
+               'partNumber', 'price_now', 'price_was', 'flashText',
+               'freeDelivery', 'variableDeliveryPrice', 'deliveryPrice', 'url')
+
+# Bump when parse_json_file extracts values differently. The cache table is
+# named after this and CSV_COLUMNS, so rows cached under another layout are
+# never reused.
+PARSE_CACHE_VERSION = 1
+PARSE_CACHE_TABLE = 'parsed_rows_' + hashlib.sha1(repr((PARSE_CACHE_VERSION, CSV_COLUMNS)).encode()).hexdigest()[:12]
 
 
 def parse_json_file(file_path, file_name):
@@ -50,21 +78,22 @@ def parse_json_file(file_path, file_name):
         dict: A dictionary containing the extracted product details, or None on failure.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # orjson parses the raw bytes directly, skipping a str decode
+        with open(file_path, 'rb', buffering=1 << 20) as f:
+            data = orjson.loads(f.read())
 
-        # Navigate to the main product data sections
-        product_store = data.get('productStore', {})
-        store_data = product_store.get('data', {})
-        attributes = store_data.get('attributes', {})
+        # Navigate to the main product data sections, keeping only the
+        # productStore.data subtree so the rest of the page state is freed now
+        store_data = (data.get('productStore') or _EMPTY).get('data') or _EMPTY
+        del data
+        attributes = store_data.get('attributes') or _EMPTY
 
         # The 'prices' object is inside 'store_data' (productStore -> data)
-        prices_data = store_data.get('prices', {})
-        prices = prices_data.get('attributes', {})
-        delivery = prices.get('delivery', {})
+        prices = (store_data.get('prices') or _EMPTY).get('attributes') or _EMPTY
+        delivery = prices.get('delivery') or _EMPTY
 
         # Extract search term from filename (remove .json extension and convert _ to /)
-        search_term = file_name.replace('.json', '').replace('_', '/')
+        search_term = file_name[:-5].translate(_SEARCH_TERM_TABLE)
 
         # --- Data Extraction ---
         part_number = attributes.get('partNumber')
@@ -81,12 +110,12 @@ def parse_json_file(file_path, file_name):
             'freeDelivery': delivery.get('freeDelivery'),
             'variableDeliveryPrice': delivery.get('variableDeliveryPrice'),
             'deliveryPrice': delivery.get('deliveryPrice'),
-            'url': f"https://www.argos.co.uk/product/{part_number}" if part_number else None
+            'url': PRODUCT_URL_PREFIX + str(part_number) if part_number else None
         }
 
         return product_details
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Warning: Could not decode JSON from file: {file_path}")
         return None
     except Exception as e:
@@ -94,6 +123,123 @@ def parse_json_file(file_path, file_name):
         return None
 
 
+def _parse_worker(args):
+    """
+    Process pool entry point; unpacks (file_path, file_name) for parse_json_file.
+    Defined at module level so it can be pickled.
+    """
+    return parse_json_file(*args)
+
+
+def open_parse_cache():
+    """
+    Opens the parse cache from earlier runs, dropping tables written for
+    another PARSE_CACHE_TABLE (an older column layout or extraction).
+
+    Returns:
+        sqlite3.Connection: The cache connection, or None if it could not be opened.
+    """
+    try:
+        conn = sqlite3.connect(PARSE_CACHE_FILE)
+        stale_tables = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'parsed_rows%' AND name != ?",
+            (PARSE_CACHE_TABLE,))]
+        with conn:
+            for table in stale_tables:
+                conn.execute(f'DROP TABLE "{table}"')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {PARSE_CACHE_TABLE} '
+                         '(name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, row BLOB)')
+        return conn
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open parse cache '{PARSE_CACHE_FILE}': {e}")
+        return None
+
+
+def lookup_parse_cache(conn, file_name, key):
+    """
+    Looks up the cached row for a file.
+
+    Args:
+        conn (sqlite3.Connection): The cache connection, or None.
+        file_name (str): The name of the JSON file.
+        key (tuple): The file's (mtime_ns, size).
+
+    Returns:
+        bytes: The cached row as JSON, or None if the file is not cached or has changed.
+    """
+    if conn is None:
+        return None
+    try:
+        cached = conn.execute(f'SELECT row FROM {PARSE_CACHE_TABLE} WHERE name = ? AND mtime_ns = ? AND size = ?',
+                              (file_name, *key)).fetchone()
+    except sqlite3.Error:
+        return None
+    return cached[0] if cached else None
+
+
+def store_parse_cache(conn, new_entries):
+    """
+    Stores newly parsed rows in the parse cache.
+
+    Args:
+        conn (sqlite3.Connection): The cache connection, or None.
+        new_entries (list): (file_name, mtime_ns, size, row_json) tuples.
+    """
+    if conn is None or not new_entries:
+        return
+    try:
+        with conn:
+            conn.executemany(f'INSERT OR REPLACE INTO {PARSE_CACHE_TABLE} (name, mtime_ns, size, row) '
+                             'VALUES (?, ?, ?, ?)', new_entries)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not update parse cache '{PARSE_CACHE_FILE}': {e}")
+
+
+def iter_product_rows(json_files, cache):
+    """
+    Yields the extracted row (or None) for each JSON file, in order.
+
+    Files are handled CSV_WRITE_BATCH at a time. Files whose name, mtime and
+    size match the parse cache are served from it; the rest are parsed in
+    parallel and their rows stored in the cache once the batch is done. The
+    timestamp is the date of the run, so it is filled in fresh rather than
+    cached.
+
+    Args:
+        json_files (list): (file_path, file_name, stat) tuples.
+        cache (sqlite3.Connection): The parse cache, or None.
+    """
+    today = date.today().isoformat()
+
+    # Each uncached file is independent work. Processes spread the JSON
+    # decoding across cores; threads only overlap the file reads.
+    executor = ThreadPoolExecutor(max_workers=PARSE_THREADS) if USE_THREADS else ProcessPoolExecutor()
+    with executor:
+        for batch_start in range(0, len(json_files), CSV_WRITE_BATCH):
+            plan = []
+            for file_path, file_name, stat in json_files[batch_start:batch_start + CSV_WRITE_BATCH]:
+                key = (stat.st_mtime_ns, stat.st_size)
+                plan.append((file_path, file_name, key, lookup_parse_cache(cache, file_name, key)))
+
+            parsed = executor.map(_parse_worker, [(file_path, file_name) for file_path, file_name, _, cached_row in plan
+                                                  if cached_row is None], chunksize=64)
+
+            new_entries = []
+            for file_path, file_name, key, cached_row in plan:
+                if cached_row is not None:
+                    extracted_data = orjson.loads(cached_row)
+                    extracted_data['timestamp'] = today
+                else:
+                    extracted_data = next(parsed)
+                    if extracted_data:
+                        row = {field: value for field, value in extracted_data.items() if field != 'timestamp'}
+                        new_entries.append((file_name, *key, orjson.dumps(row)))
+
+                yield extracted_data
+
+            store_parse_cache(cache, new_entries)
+
+
 def main():
     """
     Main function to find JSON files, parse them, and save to a CSV.
@@ -105,8 +251,11 @@ def main():
         print("Please run the scraping script first to generate the JSON files.")
         return
 
-    # Find all files in the directory that end with .json
-    json_files = [f for f in os.listdir(INPUT_DIRECTORY) if f.endswith('.json')]
+    # Find all files in the directory that end with .json (scandir entries
+    # carry the full path and file type without extra stat calls)
+    with os.scandir(INPUT_DIRECTORY) as entries:
+        json_files = [(entry.path, entry.name, entry.stat()) for entry in entries
+                      if entry.name.endswith('.json') and entry.is_file()]
 
     if not json_files:
         print(f"No .json files found in the '{INPUT_DIRECTORY}' directory.")
@@ -114,38 +263,43 @@ def main():
 
     print(f"Found {len(json_files)} JSON files to process.")
 
-    all_products_data = []
+    # Only files changed since the last run are parsed again
+    cache = open_parse_cache()
 
-    # Loop through each file path and parse the data
-    for file_name in json_files:
-        file_path = os.path.join(INPUT_DIRECTORY, file_name)
-        extracted_data = parse_json_file(file_path, file_name)
+    # Rows are streamed to the CSV as they arrive rather than collected first,
+    # written a batch at a time in CSV_COLUMNS order. The file is only opened
+    # once the first batch is ready, so nothing is created when no data could
+    # be extracted.
+    row_values = itemgetter(*CSV_COLUMNS)
+    rows = (row_values(extracted_data)
+            for extracted_data in iter_product_rows(json_files, cache)
+            if extracted_data)
+    csv_file = None
+    rows_written = 0
+    try:
+        while batch := list(islice(rows, CSV_WRITE_BATCH)):
+            if csv_file is None:
+                csv_file = open(OUTPUT_CSV_FILE, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+                writer = csv.writer(csv_file, lineterminator='\n')
+                writer.writerow(CSV_COLUMNS)
 
-        if extracted_data:
-            all_products_data.append(extracted_data)
+            writer.writerows(batch)
+            rows_written += len(batch)
+    except Exception as e:
+        print(f"\nAn error occurred while saving the CSV file: {e}")
+        return
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if cache is not None:
+            cache.close()
 
-    if not all_products_data:
+    if not rows_written:
         print("No data was successfully extracted. The CSV file will not be created.")
         return
 
-    # Convert the list of dictionaries to a Pandas DataFrame
-    df = pd.DataFrame(all_products_data)
-
-    # Reorder columns to ensure searchTerm is first
-    column_order = ['searchTerm', 'timestamp', 'productName', 'description',
-                    'partNumber', 'price_now', 'price_was', 'flashText',
-                    'freeDelivery', 'variableDeliveryPrice', 'deliveryPrice', 'url']
-
-    # Only include columns that exist in the dataframe
-    df = df[[col for col in column_order if col in df.columns]]
-
-    # Save the DataFrame to a CSV file
-    try:
-        df.to_csv(OUTPUT_CSV_FILE, index=False, encoding='utf-8')
-        print(f"\nSuccessfully created CSV file: '{OUTPUT_CSV_FILE}'")
-        print(f"It contains data for {len(df)} products.")
-    except Exception as e:
-        print(f"\nAn error occurred while saving the CSV file: {e}")
+    print(f"\nSuccessfully created CSV file: '{OUTPUT_CSV_FILE}'")
+    print(f"It contains data for {rows_written} products.")
 
     print("\n--- Parsing process finished ---")
 